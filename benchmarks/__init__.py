@@ -0,0 +1,3 @@
+"""
+Load benchmarks for the TG Gallery streamer, driven against an in-process fake Telegram client.
+"""
@@ -0,0 +1,254 @@
+"""
+In-process stand-in for the Pyrogram client used by the streamer.
+Serves synthetic channel history and GetFile bytes without touching the network.
+
+DC placement follows Telegram by default ("migrate" model): a GetFile for a
+file stored outside the home DC raises FILE_MIGRATE_X, which is what the
+streamer's single home-DC session gets today. The "latency" model instead
+serves those files with `foreign_dc_latency` added, standing in for a client
+that keeps media sessions per DC.
+"""
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from pyrogram import enums, raw
+from pyrogram.errors import FileMigrate, FloodWait, LimitInvalid, OffsetInvalid
+from pyrogram.file_id import FileId, FileType, ThumbnailSource
+
+# Telegram only serves GetFile in 4KB-aligned parts that divide 1MB
+# and never cross a 1MB boundary.
+PART_ALIGN = 4 * 1024
+MAX_PART = 1024 * 1024
+
+# Messages returned per GetHistory round-trip in Pyrogram
+HISTORY_BATCH = 100
+
+
+class FakeClient:
+    """
+    Fake Pyrogram client serving a single synthetic channel.
+
+    Only the methods the streamer calls are implemented: get_chat,
+    get_chat_history, get_messages and invoke(upload.GetFile).
+    Every call sleeps for `latency` plus up to `jitter` seconds. GetFile on a
+    file outside `home_dc` raises FileMigrate, or pays `foreign_dc_latency` on
+    top when `dc_model` is "latency". Each call hits FLOOD_WAIT with
+    probability `flood_rate`; like Pyrogram's Session.invoke, waits up to
+    `sleep_threshold` seconds are slept through and retried, longer ones raise.
+    """
+
+    def __init__(
+        self,
+        messages: int = 1000,
+        seed: int = 0,
+        latency: float = 0.02,
+        jitter: float = 0.005,
+        home_dc: int = 2,
+        dcs=(2,),
+        foreign_dc_latency: float = 0.05,
+        dc_model: str = "migrate",
+        flood_rate: float = 0.0,
+        flood_wait: int = 5,
+        sleep_threshold: int = 10,
+        min_size: int = 1024 * 1024,
+        max_size: int = 64 * 1024 * 1024,
+        text_ratio: float = 0.1,
+        strict_offsets: bool = False,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.home_dc = home_dc
+        self.foreign_dc_latency = foreign_dc_latency
+        self.dc_model = dc_model
+        self.flood_rate = flood_rate
+        self.flood_wait = flood_wait
+        self.sleep_threshold = sleep_threshold
+        self.strict_offsets = strict_offsets
+        self.is_connected = True
+
+        self.chat = SimpleNamespace(id=-1001000000000, title="bench", username="bench")
+        self.calls = Counter()
+        self.dc_calls = Counter()
+        self.injected = Counter()
+        self.get_file_bytes = 0
+
+        # Separate RNGs so runtime jitter/floods don't perturb the dataset
+        self._rng = random.Random(seed + 1)
+        self._messages = {}
+        self._files = {}
+        self._build(random.Random(seed), messages, list(dcs), min_size, max_size, text_ratio)
+
+        # Deterministic payload; GetFile slices it instead of generating bytes
+        self._pattern = bytes(random.Random(seed).getrandbits(8) for _ in range(256)) * (2 * MAX_PART // 256)
+
+    def _build(self, rng, count, dcs, min_size, max_size, text_ratio):
+        """Populate the synthetic channel with `count` messages."""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        for message_id in range(1, count + 1):
+            message = SimpleNamespace(
+                id=message_id,
+                date=start + timedelta(minutes=message_id),
+                caption=f"caption {message_id}",
+                views=rng.randint(0, 10000),
+                media=None,
+                photo=None,
+                video=None,
+                document=None,
+                audio=None,
+            )
+            self._messages[message_id] = message
+
+            if rng.random() < text_ratio:
+                continue
+
+            dc_id = rng.choice(dcs)
+            media_id = rng.getrandbits(62)
+            kind = rng.choice(("photo", "video", "video", "document"))
+
+            if kind == "photo":
+                size = rng.randint(64 * 1024, 4 * 1024 * 1024)
+                file_id = FileId(
+                    file_type=FileType.PHOTO,
+                    dc_id=dc_id,
+                    media_id=media_id,
+                    access_hash=rng.getrandbits(62),
+                    file_reference=b"bench",
+                    thumbnail_source=ThumbnailSource.THUMBNAIL,
+                    thumbnail_file_type=FileType.PHOTO,
+                    thumbnail_size="y",
+                    volume_id=0,
+                    local_id=0,
+                ).encode()
+                message.media = enums.MessageMediaType.PHOTO
+                message.photo = SimpleNamespace(
+                    file_id=file_id,
+                    file_size=size,
+                    thumbs=[SimpleNamespace(file_size=size // 10, width=320, height=240)],
+                )
+            else:
+                size = rng.randint(min_size, max_size)
+                file_id = FileId(
+                    file_type=FileType.VIDEO if kind == "video" else FileType.DOCUMENT,
+                    dc_id=dc_id,
+                    media_id=media_id,
+                    access_hash=rng.getrandbits(62),
+                    file_reference=b"bench",
+                ).encode()
+                if kind == "video":
+                    message.media = enums.MessageMediaType.VIDEO
+                    message.video = SimpleNamespace(
+                        file_id=file_id,
+                        file_size=size,
+                        mime_type="video/mp4",
+                        file_name=f"video_{message_id}.mp4",
+                        width=1280,
+                        height=720,
+                        duration=rng.randint(10, 600),
+                    )
+                else:
+                    message.media = enums.MessageMediaType.DOCUMENT
+                    message.document = SimpleNamespace(
+                        file_id=file_id,
+                        file_size=size,
+                        mime_type="application/octet-stream",
+                        file_name=f"document_{message_id}.bin",
+                    )
+
+            self._files[media_id] = (size, dc_id)
+
+    @property
+    def media_messages(self):
+        """Messages carrying a streamable file, in id order."""
+        return [m for m in self._messages.values() if m.media]
+
+    def file_size(self, message) -> int:
+        media = message.photo or message.video or message.document or message.audio
+        return media.file_size
+
+    async def _rpc(self, method: str, dc_id: int = None):
+        """Simulate one round-trip: latency, DC hop and FLOOD_WAIT injection."""
+        dc_id = dc_id or self.home_dc
+
+        while True:
+            self.calls[method] += 1
+            self.dc_calls[dc_id] += 1
+
+            delay = self.latency + self._rng.random() * self.jitter
+            if dc_id != self.home_dc:
+                delay += self.foreign_dc_latency
+            await asyncio.sleep(delay)
+
+            if not self.flood_rate or self._rng.random() >= self.flood_rate:
+                return
+
+            if self.flood_wait > self.sleep_threshold:
+                self.injected["flood_wait_raised"] += 1
+                raise FloodWait(value=self.flood_wait)
+
+            # Pyrogram sleeps through short waits and retries the request
+            self.injected["flood_wait_slept"] += 1
+            await asyncio.sleep(self.flood_wait)
+
+    async def get_chat(self, chat_id):
+        await self._rpc("get_chat")
+        return self.chat
+
+    async def get_messages(self, chat_id, message_ids):
+        await self._rpc("get_messages")
+        return self._messages.get(message_ids)
+
+    async def get_chat_history(self, chat_id, limit: int = 0, offset_id: int = 0):
+        top = offset_id - 1 if offset_id else len(self._messages)
+        message_id = top
+        sent = 0
+
+        while message_id > 0 and (not limit or sent < limit):
+            if sent % HISTORY_BATCH == 0:
+                await self._rpc("get_history")
+            yield self._messages[message_id]
+            message_id -= 1
+            sent += 1
+
+    async def invoke(self, query):
+        if not isinstance(query, raw.functions.upload.GetFile):
+            raise NotImplementedError(f"FakeClient cannot invoke {type(query).__name__}")
+
+        size, dc_id = self._files[query.location.id]
+
+        if dc_id != self.home_dc and self.dc_model == "migrate":
+            # The home-DC session is told where the file lives instead
+            await self._rpc("get_file")
+            self.injected["file_migrate"] += 1
+            raise FileMigrate(value=dc_id)
+
+        await self._rpc("get_file", dc_id)
+
+        if self.strict_offsets:
+            if query.offset % PART_ALIGN or query.offset // MAX_PART != (query.offset + query.limit - 1) // MAX_PART:
+                raise OffsetInvalid()
+            if query.limit % PART_ALIGN or query.limit > MAX_PART or MAX_PART % query.limit:
+                raise LimitInvalid()
+
+        end = min(query.offset + query.limit, size)
+        length = max(end - query.offset, 0)
+        start = query.offset % MAX_PART
+        self.get_file_bytes += length
+
+        return raw.types.upload.File(
+            type=raw.types.storage.FileUnknown(),
+            mtime=0,
+            bytes=self._pattern[start:start + length],
+        )
+
+    def report(self) -> dict:
+        """Call counters for the run, suitable for the JSON baseline."""
+        return {
+            "calls": dict(self.calls),
+            "dc_calls": {str(dc): n for dc, n in sorted(self.dc_calls.items())},
+            "injected": dict(self.injected),
+            "get_file_bytes": self.get_file_bytes,
+        }
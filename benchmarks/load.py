@@ -0,0 +1,367 @@
+"""
+Load benchmark for the streamer routes.
+
+Swaps the Pyrogram client for benchmarks.fake_client.FakeClient, serves the
+real aiohttp routes on a local port and drives them with concurrent Range
+(/stream) and list (/api/list) clients. Prints a JSON report with throughput,
+p50/p99 latency, TTFB and peak RSS.
+
+Usage:
+    python -m benchmarks.load --range-clients 32 --list-clients 4 --output baseline.json
+    python -m benchmarks.load --compare baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import resource
+import sys
+import time
+
+# streamer.config exits without credentials; the fake client never uses them
+os.environ.setdefault("TG_API_ID", "1")
+os.environ.setdefault("TG_API_HASH", "benchmark")
+os.environ.setdefault("TG_SESSION_STRING", "benchmark" * 40)
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, web
+
+# streamer.config prints its banner to stdout; keep stdout for the JSON report
+with contextlib.redirect_stdout(sys.stderr):
+    import streamer.client
+    import streamer.routes
+    from streamer.routes import routes
+
+from .fake_client import FakeClient
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct: float):
+    """Nearest-rank percentile of `values` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def to_ms(seconds):
+    """Seconds to rounded milliseconds, passing None through."""
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def peak_rss_mib() -> float:
+    """Peak RSS of this process; covers server, clients and fake together."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux/BSD
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Turn raw per-request samples into the report section for one client kind."""
+    latency = samples["latency"]
+    ttfb = samples["ttfb"]
+    return {
+        "requests": len(latency) + samples["errors"],
+        "errors": samples["errors"],
+        "timeouts": samples["timeouts"],
+        "bytes": samples["bytes"],
+        "failed_bytes": samples["failed_bytes"],
+        "requests_per_s": round(len(latency) / elapsed, 2) if elapsed else 0.0,
+        "throughput_mib_s": round(samples["bytes"] / elapsed / (1024 * 1024), 3) if elapsed else 0.0,
+        # Latency fields are None when no request of this kind succeeded
+        "latency_ms": {
+            "p50": to_ms(percentile(latency, 50)),
+            "p99": to_ms(percentile(latency, 99)),
+            "max": to_ms(max(latency, default=None)),
+        },
+        "ttfb_ms": {
+            "p50": to_ms(percentile(ttfb, 50)),
+            "p99": to_ms(percentile(ttfb, 99)),
+        },
+    }
+
+
+def new_samples() -> dict:
+    return {"latency": [], "ttfb": [], "bytes": 0, "failed_bytes": 0, "errors": 0, "timeouts": 0}
+
+
+async def range_client(session, base_url, fake, rng, args, samples):
+    """Issue `args.requests` Range requests against random media messages."""
+    messages = fake.media_messages
+
+    for _ in range(args.requests):
+        message = rng.choice(messages)
+        size = fake.file_size(message)
+        start = rng.randrange(0, size)
+        if args.aligned:
+            start -= start % 4096
+        end = min(start + args.range_size, size) - 1
+        expected = end - start + 1
+
+        url = f"{base_url}/stream?channel=bench&message_id={message.id}&filename=f{message.id}"
+        headers = {"Range": f"bytes={start}-{end}"}
+
+        began = time.perf_counter()
+        first_byte = None
+        received = 0
+        try:
+            async with session.get(url, headers=headers) as resp:
+                async for chunk in resp.content.iter_any():
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+                    received += len(chunk)
+                ok = resp.status == 206 and received == expected
+        except asyncio.TimeoutError:
+            # Truncated bodies leave the client waiting on Content-Length
+            samples["timeouts"] += 1
+            ok = False
+        except Exception as e:
+            logger.debug(f"[BENCH] range request failed: {e}")
+            ok = False
+
+        if not ok:
+            samples["errors"] += 1
+            samples["failed_bytes"] += received
+            continue
+        samples["bytes"] += received
+        samples["latency"].append(time.perf_counter() - began)
+        samples["ttfb"].append(first_byte - began)
+
+
+async def list_client(session, base_url, fake, rng, args, samples):
+    """Issue `args.requests` /api/list calls at random history offsets."""
+    for _ in range(args.requests):
+        offset_id = rng.randint(0, args.messages)
+        url = f"{base_url}/api/list?channel=bench&limit={args.list_limit}&offset_id={offset_id}"
+
+        began = time.perf_counter()
+        first_byte = None
+        received = 0
+        try:
+            async with session.get(url) as resp:
+                async for chunk in resp.content.iter_any():
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+                    received += len(chunk)
+                ok = resp.status == 200
+        except asyncio.TimeoutError:
+            samples["timeouts"] += 1
+            ok = False
+        except Exception as e:
+            logger.debug(f"[BENCH] list request failed: {e}")
+            ok = False
+
+        if not ok:
+            samples["errors"] += 1
+            samples["failed_bytes"] += received
+            continue
+        samples["bytes"] += received
+        samples["latency"].append(time.perf_counter() - began)
+        samples["ttfb"].append(first_byte - began)
+
+
+async def run(args) -> dict:
+    """Start the routes on a local port against a FakeClient and run the load."""
+    fake = FakeClient(
+        messages=args.messages,
+        seed=args.seed,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        home_dc=args.home_dc,
+        dcs=args.dcs,
+        foreign_dc_latency=args.foreign_dc_latency / 1000,
+        dc_model=args.dc_model,
+        flood_rate=args.flood_rate,
+        flood_wait=args.flood_wait,
+        sleep_threshold=args.sleep_threshold,
+        min_size=args.min_size,
+        max_size=args.max_size,
+        strict_offsets=args.strict_offsets,
+    )
+
+    # routes.py binds `app` at import time, so both references must be swapped
+    streamer.client.app = fake
+    streamer.routes.app = fake
+
+    web_app = web.Application()
+    web_app.add_routes(routes)
+    runner = web.AppRunner(web_app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    stream_samples = new_samples()
+    list_samples = new_samples()
+
+    try:
+        connector = TCPConnector(limit=0)
+        timeout = ClientTimeout(total=args.timeout)
+        async with ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = [
+                range_client(session, base_url, fake, random.Random(f"{args.seed}-range-{i}"), args, stream_samples)
+                for i in range(args.range_clients)
+            ]
+            tasks += [
+                list_client(session, base_url, fake, random.Random(f"{args.seed}-list-{i}"), args, list_samples)
+                for i in range(args.list_clients)
+            ]
+
+            began = time.perf_counter()
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - began
+    finally:
+        await runner.cleanup()
+
+    return {
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "compare", "tolerance", "log_level")
+        },
+        "elapsed_s": round(elapsed, 3),
+        "stream": summarize(stream_samples, elapsed),
+        "list": summarize(list_samples, elapsed),
+        "peak_rss_mib": peak_rss_mib(),
+        "fake": fake.report(),
+    }
+
+
+HIGHER_IS_BETTER = True
+LOWER_IS_BETTER = False
+
+COMPARED_METRICS = (
+    (("stream", "throughput_mib_s"), HIGHER_IS_BETTER),
+    (("stream", "latency_ms", "p50"), LOWER_IS_BETTER),
+    (("stream", "latency_ms", "p99"), LOWER_IS_BETTER),
+    (("stream", "ttfb_ms", "p50"), LOWER_IS_BETTER),
+    (("stream", "ttfb_ms", "p99"), LOWER_IS_BETTER),
+    (("stream", "errors"), LOWER_IS_BETTER),
+    (("stream", "timeouts"), LOWER_IS_BETTER),
+    (("list", "requests_per_s"), HIGHER_IS_BETTER),
+    (("list", "latency_ms", "p50"), LOWER_IS_BETTER),
+    (("list", "latency_ms", "p99"), LOWER_IS_BETTER),
+    (("list", "errors"), LOWER_IS_BETTER),
+    (("list", "timeouts"), LOWER_IS_BETTER),
+    (("peak_rss_mib",), LOWER_IS_BETTER),
+)
+
+
+def lookup(report: dict, path):
+    """Follow `path` into `report`, returning None if any key is missing."""
+    value = report
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 5.0) -> int:
+    """
+    Print the change of each headline metric relative to `baseline`.
+
+    A metric is flagged REGRESSED when it moves the wrong way by more than
+    `tolerance` percent, goes from zero to non-zero in the bad direction, or
+    disappears (e.g. no successful requests left to measure latency on).
+    Returns the number of regressions.
+    """
+    old_config = baseline.get("config", {})
+    new_config = current.get("config", {})
+    for key in sorted(set(old_config) | set(new_config)):
+        if old_config.get(key) != new_config.get(key):
+            print(f"WARNING: config {key} differs: {old_config.get(key)} -> {new_config.get(key)}", file=sys.stderr)
+
+    regressions = 0
+    for path, higher_is_better in COMPARED_METRICS:
+        old = lookup(baseline, path)
+        new = lookup(current, path)
+
+        if old is None and new is None:
+            continue
+        if new is None:
+            change, verdict = "missing", "REGRESSED"
+        elif old is None:
+            change, verdict = "new", ""
+        else:
+            worse = new < old if higher_is_better else new > old
+            if old:
+                pct = (new - old) / old * 100
+                change = f"{pct:+.1f}%"
+                significant = abs(pct) > tolerance
+            else:
+                change = "from 0" if new else "+0.0%"
+                significant = new != old
+            if significant:
+                verdict = "REGRESSED" if worse else "improved"
+            else:
+                verdict = ""
+
+        regressions += verdict == "REGRESSED"
+        print(f"{'.'.join(path):<28} {str(old):>12} -> {str(new):>12}  {change:>8}  {verdict}", file=sys.stderr)
+
+    print(f"{regressions} regression(s) beyond {tolerance}%", file=sys.stderr)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load benchmark for the streamer routes using a fake Telegram client.")
+    parser.add_argument("--range-clients", type=int, default=16, help="Concurrent /stream Range clients")
+    parser.add_argument("--list-clients", type=int, default=4, help="Concurrent /api/list clients")
+    parser.add_argument("--requests", type=int, default=20, help="Requests issued by each client")
+    parser.add_argument("--range-size", type=int, default=1024 * 1024, help="Bytes requested per Range request")
+    parser.add_argument("--aligned", action="store_true", help="Align Range starts to 4KB")
+    parser.add_argument("--list-limit", type=int, default=50, help="'limit' passed to /api/list")
+    parser.add_argument("--messages", type=int, default=1000, help="Synthetic messages in the channel")
+    parser.add_argument("--min-size", type=int, default=1024 * 1024, help="Smallest synthetic video/document")
+    parser.add_argument("--max-size", type=int, default=64 * 1024 * 1024, help="Largest synthetic video/document")
+    parser.add_argument("--latency", type=float, default=20.0, help="Base RPC latency in ms")
+    parser.add_argument("--jitter", type=float, default=5.0, help="Extra random RPC latency in ms")
+    parser.add_argument("--home-dc", type=int, default=2, help="DC the fake client is logged into")
+    parser.add_argument("--dcs", type=lambda s: [int(x) for x in s.split(",")], default=[2],
+                        help="Comma-separated DCs files are spread across, e.g. 2,4")
+    parser.add_argument("--dc-model", choices=("migrate", "latency"), default="migrate",
+                        help="Foreign-DC GetFile raises FILE_MIGRATE (as Telegram does) or only adds latency")
+    parser.add_argument("--foreign-dc-latency", type=float, default=50.0,
+                        help="Extra ms for GetFile on a file outside the home DC (latency model)")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="Probability an RPC hits FLOOD_WAIT")
+    parser.add_argument("--flood-wait", type=int, default=5, help="Seconds reported by injected FLOOD_WAIT")
+    parser.add_argument("--sleep-threshold", type=int, default=10,
+                        help="FLOOD_WAIT up to this many seconds is slept through and retried, as in Pyrogram")
+    parser.add_argument("--strict-offsets", action="store_true",
+                        help="Reject GetFile offsets/limits Telegram would reject")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the dataset and client request mix")
+    parser.add_argument("--timeout", type=float, default=15.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON report to diff the run against")
+    parser.add_argument("--tolerance", type=float, default=5.0,
+                        help="Percent change allowed before --compare flags a metric as regressed")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the streamer during the run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(args.log_level)
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()